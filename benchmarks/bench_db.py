@@ -0,0 +1,116 @@
+"""
+Load benchmark comparing the sync (threadpool + Session) and async (AsyncSession)
+database paths of the Job Description Generator API.
+
+Usage:
+    python benchmarks/bench_db.py --requests 2000 --concurrency 64
+
+The benchmark writes to a throwaway SQLite file unless --database-url is given;
+an existing DATABASE_URL in the environment is deliberately ignored.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--requests", type=int, default=2000)
+parser.add_argument("--concurrency", type=int, default=64)
+parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of requests that are inserts")
+parser.add_argument("--database-url", help="Database to load (default: a temporary SQLite file)")
+args = parser.parse_args()
+
+# Point both engines at the benchmark database before the app modules are imported
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+from typing import List
+
+from src.app.database import async_engine, engine, get_db
+from src.app.main import app as async_app
+from src.app.models import models
+from src.app.schemas import schemas
+
+def build_sync_app():
+    """The pre-async routes: blocking handlers holding a Session from get_db."""
+    app = FastAPI()
+
+    @app.post("/companies/", response_model=schemas.Company)
+    def create_company(company: schemas.CompanyCreate, db: Session = Depends(get_db)):
+        db_company = models.Company(**company.dict())
+        db.add(db_company)
+        db.commit()
+        db.refresh(db_company)
+        return db_company
+
+    @app.get("/companies/", response_model=List[schemas.Company])
+    def get_companies(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+        return db.query(models.Company).offset(skip).limit(limit).all()
+
+    return app
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_load(app, total, concurrency, write_ratio):
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                if (i % 100) < write_ratio * 100:
+                    response = await client.post("/companies/", json={"name": f"Company {i}", "industry": "Tech"})
+                else:
+                    response = await client.get("/companies/", params={"limit": 20})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "rps": total / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+async def main(args):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+    results = {}
+    for name, app in (("sync", build_sync_app()), ("async", async_app)):
+        await run_load(app, min(200, args.requests), args.concurrency, args.write_ratio)  # warm-up
+        results[name] = await run_load(app, args.requests, args.concurrency, args.write_ratio)
+
+    print(f"{'path':<8}{'req/s':>12}{'p50 ms':>12}{'p99 ms':>12}")
+    for name, stats in results.items():
+        print(f"{name:<8}{stats['rps']:>12.1f}{stats['p50_ms']:>12.2f}{stats['p99_ms']:>12.2f}")
+
+    await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(args))
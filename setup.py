@@ -24,6 +24,8 @@ setup(
             "flake8>=6.1.0",
             "mypy>=1.7.0",
             "pytest-cov>=4.1.0",
+            "httpx>=0.27.0,<0.28",
+            "asgi-lifespan>=2.1.0",
         ],
     },
 ) 
\ No newline at end of file
@@ -1,21 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from ...database import get_db
+from ...database import get_async_db
 from ...models import models
 from ...schemas import schemas
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.Company)
-def create_company(company: schemas.CompanyCreate, db: Session = Depends(get_db)):
+async def create_company(company: schemas.CompanyCreate, db: AsyncSession = Depends(get_async_db)):
     db_company = models.Company(**company.dict())
     db.add(db_company)
-    db.commit()
-    db.refresh(db_company)
+    await db.commit()
+    await db.refresh(db_company)
     return db_company
 
 @router.get("/", response_model=List[schemas.Company])
-def get_companies(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    companies = db.query(models.Company).offset(skip).limit(limit).all()
-    return companies 
\ No newline at end of file
+async def get_companies(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.Company).offset(skip).limit(limit))
+    return result.scalars().all()
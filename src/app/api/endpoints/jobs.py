@@ -1,36 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 from langchain_community.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import SystemMessagePromptTemplate, HumanMessagePromptTemplate
-from ...database import get_db
+from langchain_core.utils.json import parse_partial_json
+from ...cache import description_cache, make_cache_key
+from ...database import AsyncSessionLocal, get_async_db
 from ...models import models
+from ...ratelimit import AsyncRateLimiter
 from ...schemas import schemas
+from datetime import datetime
+import asyncio
+import json
 import os
 
 router = APIRouter()
 
+# Default upper bound for a single LLM round trip, overridable per request
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Batch generation: parallel LLM calls per batch, process-wide LLM call rate and commit chunk size
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+BATCH_COMMIT_SIZE = int(os.getenv("BATCH_COMMIT_SIZE", "50"))
+LLM_RATE_LIMIT_PER_SECOND = float(os.getenv("LLM_RATE_LIMIT_PER_SECOND", "10"))
+
+llm_rate_limiter = AsyncRateLimiter(LLM_RATE_LIMIT_PER_SECOND, burst=BATCH_CONCURRENCY)
+
+class ClientDisconnected(Exception):
+    pass
+
 @router.post("/", response_model=schemas.JobPosting)
-def create_job_posting(job: schemas.JobPostingCreate, db: Session = Depends(get_db)):
+async def create_job_posting(job: schemas.JobPostingCreate, db: AsyncSession = Depends(get_async_db)):
     db_job = models.JobPosting(**job.dict())
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
     return db_job
 
+# Model parameters, also part of the description cache key
+MODEL_PARAMS = {
+    "model_name": "gpt-4",
+    "temperature": 0.7,
+    "max_tokens": 2000,
+    "model_kwargs": {
+        "top_p": 0.9,
+        "frequency_penalty": 0.5,
+        "presence_penalty": 0.5
+    }
+}
+
 def init_chat_model():
-    return ChatOpenAI(
-        model_name="gpt-4",
-        temperature=0.7,
-        max_tokens=2000,
-        model_kwargs={
-            "top_p": 0.9,
-            "frequency_penalty": 0.5,
-            "presence_penalty": 0.5
-        }
-    )
+    return ChatOpenAI(**MODEL_PARAMS)
 
 def create_job_description_prompt():
     system_template = """You are an expert job description writer. Create a professional job description based on the following information:
@@ -56,51 +82,301 @@ def create_job_description_prompt():
     
     return ChatPromptTemplate.from_messages([system_message_prompt, human_message_prompt])
 
-@router.post("/{job_id}/description", response_model=schemas.JobDescription)
-async def generate_job_description(
-    job_id: int,
-    request: schemas.JobDescriptionRequest,
-    db: Session = Depends(get_db)
-):
+def build_prompt_variables(job_posting, company, request: schemas.JobDescriptionRequest):
+    return {
+        "job_title": job_posting.title,
+        "company_name": company.name,
+        "company_industry": company.industry or "Not specified",
+        "required_tools": ", ".join(request.required_tools),
+        "company_culture": request.company_culture or "Not specified"
+    }
+
+def build_chain():
+    # Initialize LangChain components
+    chat_model = init_chat_model()
+    prompt = create_job_description_prompt()
+    parser = PydanticOutputParser(pydantic_object=schemas.JobDescription)
+    return prompt | chat_model | parser
+
+async def run_chain(chain, prompt_variables, http_request: Request, timeout: float):
+    """
+    Run the chain on the event loop via ainvoke. The call is cancelled when it
+    exceeds the timeout or when the client disconnects.
+    """
+    task = asyncio.create_task(chain.ainvoke(prompt_variables))
+    disconnected = False
+
+    async def watch_disconnect():
+        nonlocal disconnected
+        while not task.done():
+            if await http_request.is_disconnected():
+                disconnected = True
+                task.cancel()
+                return
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        return await asyncio.wait_for(task, timeout)
+    except asyncio.CancelledError:
+        if disconnected:
+            raise ClientDisconnected()
+        raise
+    finally:
+        watcher.cancel()
+
+async def load_job_and_company(db: AsyncSession, job_id: int):
     # Get job posting and company information
-    job_posting = db.query(models.JobPosting).filter(models.JobPosting.id == job_id).first()
+    result = await db.execute(select(models.JobPosting).where(models.JobPosting.id == job_id))
+    job_posting = result.scalars().first()
     if not job_posting:
         raise HTTPException(status_code=404, detail="Job posting not found")
     
-    company = db.query(models.Company).filter(models.Company.id == job_posting.company_id).first()
+    result = await db.execute(select(models.Company).where(models.Company.id == job_posting.company_id))
+    company = result.scalars().first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
+    return job_posting, company
 
-    # Initialize LangChain components
-    chat_model = init_chat_model()
-    prompt = create_job_description_prompt()
-    parser = PydanticOutputParser(pydantic_object=schemas.JobDescription)
+@router.post("/{job_id}/description", response_model=schemas.JobDescription)
+async def generate_job_description(
+    job_id: int,
+    request: schemas.JobDescriptionRequest,
+    http_request: Request,
+    response: Response,
+    timeout: Optional[float] = Query(None, gt=0, description="LLM timeout in seconds"),
+    cache: Optional[Literal["bypass", "refresh"]] = Query(
+        None, description="bypass: skip the cache entirely; refresh: regenerate and overwrite the cached entry"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    job_posting, company = await load_job_and_company(db, job_id)
 
     # Prepare prompt variables
-    prompt_variables = {
-        "job_title": job_posting.title,
-        "company_name": company.name,
-        "company_industry": company.industry or "Not specified",
-        "required_tools": ", ".join(request.required_tools),
-        "company_culture": request.company_culture or "Not specified"
-    }
+    prompt_variables = build_prompt_variables(job_posting, company, request)
+
+    # Serve repeated prompts from the cache
+    cache_key = make_cache_key(prompt_variables, MODEL_PARAMS)
+    if cache is None:
+        cached = await description_cache.get(db, cache_key)
+        if cached is not None:
+            response.headers["X-Cache"] = "hit"
+            job_posting.description = cached
+            await db.commit()
+            return schemas.JobDescription.model_validate_json(cached)
+    response.headers["X-Cache"] = cache or "miss"
 
     try:
         # Generate job description
-        chain = prompt | chat_model | parser
-        job_description = chain.invoke(prompt_variables)
+        chain = build_chain()
+        job_description = await run_chain(chain, prompt_variables, http_request, timeout or LLM_TIMEOUT_SECONDS)
 
         # Save to database
         job_posting.description = job_description.json()
-        db.commit()
-        db.refresh(job_posting)
+        if cache != "bypass":
+            await description_cache.set(db, cache_key, job_posting.description)
+        await db.commit()
+        await db.refresh(job_posting)
 
         return job_description
 
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out generating job description")
+    except ClientDisconnected:
+        # Nobody is listening for the response; just stop the work
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating job description: {str(e)}")
 
+async def generate_batch_results(batch: schemas.JobDescriptionBatchRequest):
+    """
+    Yield one result dict per job as it finishes. Rows are loaded in one
+    query, LLM calls fan out under a semaphore and the shared rate limiter, and
+    descriptions are committed in chunks of BATCH_COMMIT_SIZE.
+    """
+    concurrency = min(batch.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncSessionLocal() as db:
+        # Load every job posting and its company in one query
+        job_ids = {item.job_id for item in batch.items}
+        result = await db.execute(
+            select(models.JobPosting.id, models.JobPosting.title, models.Company.name, models.Company.industry)
+            .join(models.Company, models.JobPosting.company_id == models.Company.id)
+            .where(models.JobPosting.id.in_(job_ids))
+        )
+        rows = {row.id: row for row in result}
+
+        pending = {}
+        for item in batch.items:
+            row = rows.get(item.job_id)
+            if row is None:
+                yield {"job_id": item.job_id, "status": "error", "error": "Job posting or company not found"}
+                continue
+            # The row carries both the posting title and the company columns
+            prompt_variables = build_prompt_variables(row, row, item)
+            pending[item.job_id] = (prompt_variables, make_cache_key(prompt_variables, MODEL_PARAMS))
+
+        cached = await description_cache.get_many(db, (key for _, key in pending.values()))
+        chain = build_chain() if len(cached) < len(pending) else None
+        to_save = {}
+        to_cache = {}
+
+        async def flush():
+            if to_save:
+                now = datetime.utcnow()
+                await db.execute(
+                    update(models.JobPosting),
+                    [
+                        {"id": job_id, "description": description, "updated_at": now}
+                        for job_id, description in to_save.items()
+                    ],
+                )
+                await description_cache.set_many(db, to_cache)
+                await db.commit()
+                to_save.clear()
+                to_cache.clear()
+
+        async def describe(job_id, prompt_variables):
+            async with semaphore:
+                await llm_rate_limiter.acquire()
+                try:
+                    job_description = await asyncio.wait_for(chain.ainvoke(prompt_variables), LLM_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    return job_id, None, "Timed out generating job description"
+                except Exception as e:
+                    return job_id, None, f"Error generating job description: {str(e)}"
+                return job_id, job_description, None
+
+        tasks = []
+        for job_id, (prompt_variables, cache_key) in pending.items():
+            if cache_key in cached:
+                to_save[job_id] = cached[cache_key]
+                yield {
+                    "job_id": job_id,
+                    "status": "ok",
+                    "cached": True,
+                    "description": json.loads(cached[cache_key]),
+                }
+            else:
+                tasks.append(asyncio.create_task(describe(job_id, prompt_variables)))
+
+        try:
+            for finished in asyncio.as_completed(tasks):
+                job_id, job_description, error = await finished
+                if error:
+                    yield {"job_id": job_id, "status": "error", "error": error}
+                    continue
+                description = job_description.json()
+                to_save[job_id] = description
+                to_cache[pending[job_id][1]] = description
+                yield {"job_id": job_id, "status": "ok", "cached": False, "description": job_description.dict()}
+                if len(to_save) >= BATCH_COMMIT_SIZE:
+                    await flush()
+            await flush()
+        finally:
+            # Client went away or the batch failed: stop the outstanding LLM calls
+            for task in tasks:
+                task.cancel()
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_description_events(job_id: int, prompt_variables: dict, cache: Optional[str]):
+    """
+    Yield Server-Sent Events for one description: "token" for every model chunk,
+    "section" as each top-level section of the JSON output completes, then
+    "done" with the validated description (or "error").
+    """
+    cache_key = make_cache_key(prompt_variables, MODEL_PARAMS)
+    async with AsyncSessionLocal() as db:
+        cached = await description_cache.get(db, cache_key) if cache is None else None
+        if cached is not None:
+            job_description = schemas.JobDescription.model_validate_json(cached)
+        else:
+            chat_model = init_chat_model()
+            prompt = create_job_description_prompt()
+            parser = PydanticOutputParser(pydantic_object=schemas.JobDescription)
+            buffer = ""
+            completed = []
+            try:
+                async for chunk in (prompt | chat_model).astream(prompt_variables):
+                    if not chunk.content:
+                        continue
+                    buffer += chunk.content
+                    yield sse_event("token", {"content": chunk.content})
+
+                    # Every key except the last one in the partial JSON is final
+                    partial = parse_partial_json(buffer)
+                    if isinstance(partial, dict):
+                        for name in list(partial)[len(completed):-1]:
+                            completed.append(name)
+                            yield sse_event("section", {"name": name, "value": partial[name]})
+
+                job_description = parser.parse(buffer)
+            except Exception as e:
+                yield sse_event("error", {"detail": f"Error generating job description: {str(e)}"})
+                return
+
+            # Flush the last section(s), which partial parsing never marks as final
+            sections = job_description.dict()
+            for name in list(sections)[len(completed):]:
+                yield sse_event("section", {"name": name, "value": sections[name]})
+
+        # Save the final validated JSON
+        description = job_description.json()
+        await db.execute(
+            update(models.JobPosting)
+            .where(models.JobPosting.id == job_id)
+            .values(description=description, updated_at=datetime.utcnow())
+        )
+        if cached is None and cache != "bypass":
+            await description_cache.set(db, cache_key, description)
+        await db.commit()
+        yield sse_event("done", job_description.dict())
+
+@router.post("/{job_id}/description/stream")
+async def stream_job_description(
+    job_id: int,
+    request: schemas.JobDescriptionRequest,
+    cache: Optional[Literal["bypass", "refresh"]] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream the job description as Server-Sent Events."""
+    job_posting, company = await load_job_and_company(db, job_id)
+    prompt_variables = build_prompt_variables(job_posting, company, request)
+    return StreamingResponse(
+        stream_description_events(job_id, prompt_variables, cache),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/{job_id}/description/stream")
+async def stream_job_description_get(
+    job_id: int,
+    required_tools: List[str] = Query([], description="Required tools and technologies"),
+    company_culture: Optional[str] = Query(None, description="Optional company culture description"),
+    cache: Optional[Literal["bypass", "refresh"]] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """GET variant for EventSource clients, taking the request fields as query parameters."""
+    request = schemas.JobDescriptionRequest(required_tools=required_tools, company_culture=company_culture)
+    return await stream_job_description(job_id, request, cache, db)
+
+@router.post("/descriptions:batch")
+async def generate_job_descriptions_batch(batch: schemas.JobDescriptionBatchRequest):
+    """Generate descriptions for many jobs, streaming one NDJSON line per job as it finishes."""
+    async def ndjson():
+        async for result in generate_batch_results(batch):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/descriptions/cache")
+async def get_description_cache_stats():
+    return description_cache.snapshot()
+
 @router.get("/", response_model=List[schemas.JobPosting])
-def get_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    jobs = db.query(models.JobPosting).offset(skip).limit(limit).all()
-    return jobs 
\ No newline at end of file
+async def get_jobs(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.JobPosting).offset(skip).limit(limit))
+    return result.scalars().all()
@@ -0,0 +1,148 @@
+"""
+Content-addressed cache for generated job descriptions.
+
+Entries are keyed on a hash of the rendered prompt variables plus the model
+parameters, and live in two tiers: an in-process LRU with TTL in front of the
+persistent job_description_cache table.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, Optional
+import hashlib
+import json
+import os
+import time
+
+from .models import models
+
+DESCRIPTION_CACHE_SIZE = int(os.getenv("DESCRIPTION_CACHE_SIZE", "1024"))
+DESCRIPTION_CACHE_TTL_SECONDS = float(os.getenv("DESCRIPTION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+CACHE_MODES = ("bypass", "refresh")
+
+def make_cache_key(prompt_variables: dict, model_params: dict) -> str:
+    """Stable sha256 over the prompt variables and model parameters."""
+    payload = json.dumps({"prompt": prompt_variables, "model": model_params}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry and expires entries after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class DescriptionCache:
+    """Two-tier description cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int = DESCRIPTION_CACHE_SIZE, ttl: float = DESCRIPTION_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize, ttl)
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[str]:
+        """Return the cached description JSON, promoting persistent hits into memory."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+
+        entry = await db.get(models.JobDescriptionCache, key)
+        if entry is not None and entry.created_at >= datetime.utcnow() - timedelta(seconds=self.ttl):
+            self.stats["db_hits"] += 1
+            self.memory.set(key, entry.description)
+            return entry.description
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, db: AsyncSession, key: str, value: str):
+        """Store a description in both tiers; the caller commits the session."""
+        self.memory.set(key, value)
+        await db.merge(models.JobDescriptionCache(key=key, description=value, created_at=datetime.utcnow()))
+        self.stats["stores"] += 1
+
+    async def get_many(self, db: AsyncSession, keys: Iterable[str]) -> Dict[str, str]:
+        """Batch lookup: memory first, then one query for the remaining keys."""
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            value = self.memory.get(key)
+            if value is not None:
+                self.stats["memory_hits"] += 1
+                found[key] = value
+            else:
+                missing.append(key)
+
+        if missing:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+            result = await db.execute(
+                select(models.JobDescriptionCache).where(
+                    models.JobDescriptionCache.key.in_(missing),
+                    models.JobDescriptionCache.created_at >= cutoff,
+                )
+            )
+            db_hits = 0
+            for entry in result.scalars():
+                db_hits += 1
+                self.memory.set(entry.key, entry.description)
+                found[entry.key] = entry.description
+            self.stats["db_hits"] += db_hits
+            self.stats["misses"] += len(missing) - db_hits
+        return found
+
+    async def set_many(self, db: AsyncSession, values: Dict[str, str]):
+        """Store many descriptions with one delete and one insert; the caller commits."""
+        if not values:
+            return
+        now = datetime.utcnow()
+        for key, value in values.items():
+            self.memory.set(key, value)
+        await db.execute(delete(models.JobDescriptionCache).where(models.JobDescriptionCache.key.in_(list(values))))
+        await db.execute(
+            insert(models.JobDescriptionCache),
+            [{"key": key, "description": value, "created_at": now} for key, value in values.items()],
+        )
+        self.stats["stores"] += len(values)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["memory_hits"] + self.stats["db_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self.memory),
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.memory.clear()
+        for name in self.stats:
+            self.stats[name] = 0
+
+description_cache = DescriptionCache()
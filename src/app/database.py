@@ -1,19 +1,127 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 import os
 
-# Use SQLite database
-DATABASE_URL = "sqlite:///./jobapp.db"
+# Database URL selects the driver: plain "sqlite:///" / "postgresql://" URLs are
+# mapped to their async drivers (aiosqlite / asyncpg) for the API routes.
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobapp.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool configuration
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# SQLite tuning
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# Aliases accepted in DATABASE_URL (e.g. Heroku-style postgres:// URLs)
+DIALECT_ALIASES = {"postgres": "postgresql"}
+
+def split_url(url):
+    """Split a database URL into (dialect, driver, rest)."""
+    scheme, rest = url.split("://", 1)
+    dialect, _, driver = scheme.partition("+")
+    return DIALECT_ALIASES.get(dialect, dialect), driver, rest
+
+def is_async_url(url):
+    """Return True if the URL already names an async driver."""
+    dialect, driver, _ = split_url(url)
+    return f"{dialect}+{driver}" in ASYNC_DRIVERS.values()
+
+def to_async_url(url):
+    """Map a database URL onto its async driver, whatever sync driver it names."""
+    dialect, _, rest = split_url(url)
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(
+            f"Unsupported DATABASE_URL dialect '{dialect}': expected one of {', '.join(ASYNC_DRIVERS)}"
+        )
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+def to_sync_url(url):
+    """Map a database URL onto a sync driver, or None if only an async driver was given."""
+    dialect, driver, rest = split_url(url)
+    if dialect == "sqlite":
+        return f"sqlite://{rest}"
+    if is_async_url(url):
+        return None
+    return f"{dialect}+{driver}://{rest}" if driver else f"{dialect}://{rest}"
+
+def is_memory_sqlite(url):
+    return url.startswith("sqlite") and (url.endswith(":memory:") or url.split("://", 1)[1] in ("", "/"))
+
+def engine_options(url, is_async=False):
+    """Connection and pool arguments for the given URL."""
+    if url.startswith("sqlite"):
+        if is_memory_sqlite(url):
+            # A single shared connection, otherwise each checkout sees an empty database
+            return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+        options = {
+            "connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+        if is_async:
+            # aiosqlite defaults to NullPool for file databases
+            options["poolclass"] = AsyncAdaptedQueuePool
+        return options
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
+
+def configure_sqlite(sync_engine):
+    """Enable WAL and a busy timeout on every new SQLite connection."""
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not is_memory_sqlite(str(sync_engine.url)):
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+SYNC_DATABASE_URL = to_sync_url(DATABASE_URL)
+
+# Async engine used by the API routes
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Sync engine kept for scripts and benchmarks; unavailable for async-only URLs
+engine = create_engine(SYNC_DATABASE_URL, **engine_options(SYNC_DATABASE_URL)) if SYNC_DATABASE_URL else None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine is not None else None
+
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    configure_sqlite(async_engine.sync_engine)
+if engine is not None and SYNC_DATABASE_URL.startswith("sqlite"):
+    configure_sqlite(engine)
 
 Base = declarative_base()
 
 def get_db():
+    if SessionLocal is None:
+        raise RuntimeError(
+            f"DATABASE_URL {DATABASE_URL!r} only names an async driver; use get_async_db or a sync URL"
+        )
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import openai
@@ -11,14 +12,19 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from src.app.api.endpoints import jobs, companies
-from src.app.database import engine
+from src.app.database import async_engine
 from src.app.models import models
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables
+    async with async_engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    yield
+    await async_engine.dispose()
 
 # Initialize FastAPI app
-app = FastAPI(title="Job Description Generator API")
+app = FastAPI(title="Job Description Generator API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -27,4 +27,11 @@ class JobPosting(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    company = relationship("Company", back_populates="job_postings") 
\ No newline at end of file
+    company = relationship("Company", back_populates="job_postings")
+
+class JobDescriptionCache(Base):
+    __tablename__ = "job_description_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 of prompt variables + model parameters
+    description = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
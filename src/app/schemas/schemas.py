@@ -48,4 +48,11 @@ class JobPosting(JobPostingBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class JobDescriptionBatchItem(JobDescriptionRequest):
+    job_id: int
+
+class JobDescriptionBatchRequest(BaseModel):
+    items: List[JobDescriptionBatchItem] = Field(..., min_length=1, max_length=1000, description="Jobs to describe")
+    concurrency: Optional[int] = Field(None, ge=1, description="Maximum parallel LLM calls for this batch")
@@ -0,0 +1,264 @@
+"""Tests for the job description endpoints."""
+
+import asyncio
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+from asgi_lifespan import LifespanManager
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.app.api.endpoints import jobs
+from src.app.cache import description_cache
+from src.app.database import AsyncSessionLocal
+from src.app.main import app
+from src.app.models import models
+
+LATENCY = 0.5
+
+DESCRIPTION = {
+    "title": "Backend Engineer",
+    "overview": {"title": "Overview", "content": "Build APIs."},
+    "responsibilities": {"title": "Responsibilities", "content": "Ship code."},
+    "requirements": {"title": "Requirements", "content": "Python."},
+    "qualifications": {"title": "Qualifications", "content": "BSc."},
+    "benefits": {"title": "Benefits", "content": "Remote."},
+}
+
+class SlowChatModel(BaseChatModel):
+    """Chat model stub that answers after a fixed delay."""
+
+    latency: float = LATENCY
+    cancelled: bool = False
+    calls: int = 0
+
+    @property
+    def _llm_type(self):
+        return "slow-stub"
+
+    def _result(self):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=json.dumps(DESCRIPTION)))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return self._result()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self._result()
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        content = json.dumps(DESCRIPTION)
+        for i in range(0, len(content), 16):
+            await asyncio.sleep(self.latency / 10)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[i:i + 16]))
+
+@asynccontextmanager
+async def api_client():
+    """Client running the app's real lifespan, so tables are created and the engine disposed."""
+    async with LifespanManager(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+async def create_jobs(client, count):
+    # A fresh company per test keeps prompts, and so cache keys, unique
+    company = (await client.post("/companies/", json={"name": f"Acme {uuid.uuid4().hex}", "industry": "Tech"})).json()
+    job_ids = []
+    for i in range(count):
+        job = (await client.post("/jobs/", json={"title": f"Engineer {i}", "company_id": company["id"]})).json()
+        job_ids.append(job["id"])
+    return job_ids
+
+def test_parallel_descriptions_do_not_block_event_loop(monkeypatch):
+    """N parallel requests finish in about one latency period, not N."""
+    monkeypatch.setattr(jobs, "init_chat_model", lambda: SlowChatModel())
+    n = 10
+
+    async def run():
+        async with api_client() as client:
+            job_ids = await create_jobs(client, n)
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post(f"/jobs/{job_id}/description", json={"required_tools": ["Python"]})
+                for job_id in job_ids
+            ))
+            return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200] * n
+    assert responses[0].json()["title"] == DESCRIPTION["title"]
+    assert elapsed < LATENCY * 3
+
+def test_description_timeout(monkeypatch):
+    monkeypatch.setattr(jobs, "init_chat_model", lambda: SlowChatModel(latency=5))
+
+    async def run():
+        async with api_client() as client:
+            job_ids = await create_jobs(client, 1)
+            return await client.post(
+                f"/jobs/{job_ids[0]}/description", params={"timeout": 0.1}, json={"required_tools": []}
+            )
+
+    response = asyncio.run(run())
+    assert response.status_code == 504
+
+def test_client_disconnect_cancels_generation(monkeypatch):
+    chat_model = SlowChatModel(latency=5)
+    monkeypatch.setattr(jobs, "init_chat_model", lambda: chat_model)
+    monkeypatch.setattr(jobs, "DISCONNECT_POLL_SECONDS", 0.05)
+
+    async def run():
+        async with api_client() as client:
+            job_id = (await create_jobs(client, 1))[0]
+
+            # Drive the ASGI app directly so the client can hang up mid-request
+            body = json.dumps({"required_tools": ["Python"]}).encode()
+            disconnected = asyncio.Event()
+            request_sent = False
+            messages = []
+
+            async def receive():
+                nonlocal request_sent
+                if not request_sent:
+                    request_sent = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "POST", "scheme": "http", "path": f"/jobs/{job_id}/description",
+                "raw_path": f"/jobs/{job_id}/description".encode(), "query_string": b"",
+                "root_path": "", "headers": [(b"content-type", b"application/json")],
+                "client": ("test", 123), "server": ("test", 80),
+            }
+            request = asyncio.create_task(app(scope, receive, send))
+            await asyncio.sleep(0.2)
+            disconnected.set()
+            start = time.perf_counter()
+            await asyncio.wait_for(request, 2)
+            elapsed = time.perf_counter() - start
+
+            async with AsyncSessionLocal() as db:
+                job_posting = await db.get(models.JobPosting, job_id)
+            return messages, elapsed, job_posting
+
+    messages, elapsed, job_posting = asyncio.run(run())
+    assert messages[0]["status"] == 499
+    assert elapsed < 1
+    assert chat_model.cancelled
+    assert job_posting.description is None
+
+def test_repeated_prompt_is_served_from_cache(monkeypatch):
+    chat_model = SlowChatModel(latency=0)
+    monkeypatch.setattr(jobs, "init_chat_model", lambda: chat_model)
+    description_cache.clear()
+
+    async def run():
+        async with api_client() as client:
+            job_id = (await create_jobs(client, 1))[0]
+            url = f"/jobs/{job_id}/description"
+            payload = {"required_tools": ["Python"], "company_culture": "Remote-first"}
+            responses = [await client.post(url, json=payload)]
+            responses.append(await client.post(url, json=payload))
+            description_cache.memory.clear()
+            responses.append(await client.post(url, json=payload))
+            responses.append(await client.post(url, params={"cache": "refresh"}, json=payload))
+            responses.append(await client.post(url, params={"cache": "bypass"}, json=payload))
+            stats = (await client.get("/jobs/descriptions/cache")).json()
+            return responses, stats
+
+    responses, stats = asyncio.run(run())
+    assert [r.headers["X-Cache"] for r in responses] == ["miss", "hit", "hit", "refresh", "bypass"]
+    assert all(r.json() == DESCRIPTION for r in responses)
+    assert chat_model.calls == 3
+    assert stats["memory_hits"] == 1
+    assert stats["db_hits"] == 1
+    assert stats["misses"] == 1
+
+def test_batch_descriptions_stream_ndjson(monkeypatch):
+    chat_model = SlowChatModel(latency=0.3)
+    monkeypatch.setattr(jobs, "init_chat_model", lambda: chat_model)
+
+    async def run():
+        async with api_client() as client:
+            job_ids = await create_jobs(client, 4)
+            items = [{"job_id": job_id, "required_tools": ["Go"]} for job_id in job_ids] + [
+                {"job_id": 999999, "required_tools": []}
+            ]
+            start = time.perf_counter()
+            response = await client.post("/jobs/descriptions:batch", json={"items": items, "concurrency": 4})
+            elapsed = time.perf_counter() - start
+            jobs_list = (await client.get("/jobs/", params={"limit": 1000})).json()
+            return job_ids, response, elapsed, jobs_list
+
+    job_ids, response, elapsed, jobs_list = asyncio.run(run())
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = {line["job_id"]: line for line in map(json.loads, response.text.splitlines())}
+    assert results[999999]["status"] == "error"
+    assert all(results[job_id]["description"] == DESCRIPTION for job_id in job_ids)
+    assert chat_model.calls == 4
+    assert elapsed < 0.3 * 3
+    saved = {job["id"]: job["description"] for job in jobs_list}
+    assert all(json.loads(saved[job_id]) == DESCRIPTION for job_id in job_ids)
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_stream_description_sse(monkeypatch):
+    chat_model = SlowChatModel(latency=1)
+    monkeypatch.setattr(jobs, "init_chat_model", lambda: chat_model)
+
+    async def run():
+        async with api_client() as client:
+            job_id = (await create_jobs(client, 1))[0]
+
+            # httpx's ASGI transport buffers bodies, so time the ASGI messages directly
+            path = f"/jobs/{job_id}/description/stream"
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append((time.perf_counter(), message))
+
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+                "query_string": b"required_tools=Rust&required_tools=Go", "root_path": "",
+                "headers": [], "client": ("test", 123), "server": ("test", 80),
+            }
+            start = time.perf_counter()
+            await app(scope, receive, send)
+            job = next(j for j in (await client.get("/jobs/", params={"limit": 1000})).json() if j["id"] == job_id)
+            return start, messages, job
+
+    start, messages, job = asyncio.run(run())
+    headers = dict(messages[0][1]["headers"])
+    assert headers[b"content-type"].startswith(b"text/event-stream")
+    bodies = [(at, message["body"]) for at, message in messages if message["type"] == "http.response.body"]
+    first_byte = next(at for at, body in bodies if body) - start
+    assert first_byte < 0.5
+    events = parse_sse(b"".join(body for _, body in bodies).decode())
+    assert [data["name"] for event, data in events if event == "section"] == list(DESCRIPTION)
+    assert events[-1] == ("done", DESCRIPTION)
+    assert json.loads(job["description"]) == DESCRIPTION